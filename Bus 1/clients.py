@@ -1,215 +1,283 @@
-import threading
-import time
-import queue
-from typing import Optional
-
-
-class Client(threading.Thread):
-    """Simulated client for threading approach"""
-    
-    def __init__(self, client_id: str, booking_system, travel_date: str, 
-                 booking_delay: float = 0.1, preferred_bus: Optional[int] = None,
-                 preferred_seat: Optional[int] = None):
-        super().__init__()
-        self.client_id = client_id
-        self.booking_system = booking_system
-        self.travel_date = travel_date
-        self.booking_delay = booking_delay
-        self.preferred_bus = preferred_bus
-        self.preferred_seat = preferred_seat
-        self.result = None
-
-    def run(self):
-        """Execute booking request"""
-        time.sleep(self.booking_delay)
-        self.result = self.booking_system.book_seat_for_client(
-            self.client_id, 
-            self.travel_date,
-            self.preferred_bus,
-            self.preferred_seat
-        )
-
-
-class BulkBookingClient:
-    """Client for making multiple bookings"""
-    
-    def __init__(self, client_id: str, booking_system):
-        self.client_id = client_id
-        self.booking_system = booking_system
-        self.bookings = []
-
-    def make_booking(self, travel_date: str, preferred_bus: Optional[int] = None,
-                    preferred_seat: Optional[int] = None) -> dict:
-        """Make a single booking"""
-        result = self.booking_system.book_seat_for_client(
-            self.client_id,
-            travel_date,
-            preferred_bus,
-            preferred_seat
-        )
-        if result["status"] == "success":
-            self.bookings.append(result["booking_id"])
-        return result
-
-    def cancel_booking(self, booking_id: str) -> bool:
-        """Cancel a booking"""
-        success = self.booking_system.cancel_booking(booking_id, self.client_id)
-        if success and booking_id in self.bookings:
-            self.bookings.remove(booking_id)
-        return success
-
-    def get_my_bookings(self) -> list:
-        """Get all bookings for this client"""
-        return self.booking_system.get_client_bookings(self.client_id)
-
-    def cancel_all_bookings(self) -> int:
-        """Cancel all bookings for this client"""
-        cancelled = 0
-        for booking_id in self.bookings.copy():
-            if self.cancel_booking(booking_id):
-                cancelled += 1
-        return cancelled
-
-
-def client_booking_process(client_id: str, booking_system, travel_date: str, 
-                          result_queue: queue.Queue, preferred_bus: Optional[int] = None,
-                          preferred_seat: Optional[int] = None):
-    """For multiprocessing approach"""
-    result = booking_system.book_seat_for_client(
-        client_id, 
-        travel_date,
-        preferred_bus,
-        preferred_seat
-    )
-    result_queue.put(result)
-
-
-class LoadGenerator:
-    """Generates realistic booking load for testing"""
-    
-    def __init__(self, booking_system):
-        self.booking_system = booking_system
-        self.active_clients = []
-
-    def generate_steady_load(self, num_clients: int, dates: list, 
-                           delay_between_clients: float = 0.1) -> list:
-        """Generate steady booking load"""
-        clients = []
-        
-        for i in range(num_clients):
-            date = dates[i % len(dates)]
-            client = Client(
-                f"load_client_{i}",
-                self.booking_system,
-                date,
-                booking_delay=delay_between_clients
-            )
-            client.start()
-            clients.append(client)
-        
-        return clients
-
-    def generate_burst_load(self, num_clients: int, dates: list) -> list:
-        """Generate burst of concurrent bookings"""
-        clients = []
-        
-        for i in range(num_clients):
-            date = dates[i % len(dates)]
-            client = Client(
-                f"burst_client_{i}",
-                self.booking_system,
-                date,
-                booking_delay=0.01  # Minimal delay for burst
-            )
-            client.start()
-            clients.append(client)
-        
-        return clients
-
-    def generate_mixed_load(self, num_steady: int, num_burst: int, dates: list) -> tuple:
-        """Generate mixed load pattern"""
-        steady_clients = self.generate_steady_load(num_steady, dates)
-        time.sleep(0.5)  # Wait before burst
-        burst_clients = self.generate_burst_load(num_burst, dates)
-        
-        return steady_clients, burst_clients
-
-    def wait_for_clients(self, clients: list) -> list:
-        """Wait for all clients to complete and return results"""
-        for client in clients:
-            client.join()
-        
-        return [c.result for c in clients if c.result is not None]
-
-
-class ClientSimulator:
-    """Advanced client simulation with realistic patterns"""
-    
-    def __init__(self, booking_system):
-        self.booking_system = booking_system
-
-    def simulate_normal_day(self, num_clients: int, dates: list) -> dict:
-        """Simulate normal booking day with varied timing"""
-        import random
-        
-        clients = []
-        results = {"morning": [], "afternoon": [], "evening": []}
-        
-        # Morning rush (40% of clients)
-        morning_clients = int(num_clients * 0.4)
-        for i in range(morning_clients):
-            date = random.choice(dates)
-            delay = random.uniform(0, 0.2)
-            client = Client(f"morning_{i}", self.booking_system, date, delay)
-            client.start()
-            clients.append(("morning", client))
-        
-        time.sleep(1)  # Simulate time gap
-        
-        # Afternoon steady (30% of clients)
-        afternoon_clients = int(num_clients * 0.3)
-        for i in range(afternoon_clients):
-            date = random.choice(dates)
-            delay = random.uniform(0.1, 0.5)
-            client = Client(f"afternoon_{i}", self.booking_system, date, delay)
-            client.start()
-            clients.append(("afternoon", client))
-        
-        time.sleep(1)  # Simulate time gap
-        
-        # Evening rush (30% of clients)
-        evening_clients = num_clients - morning_clients - afternoon_clients
-        for i in range(evening_clients):
-            date = random.choice(dates)
-            delay = random.uniform(0, 0.15)
-            client = Client(f"evening_{i}", self.booking_system, date, delay)
-            client.start()
-            clients.append(("evening", client))
-        
-        # Collect results
-        for period, client in clients:
-            client.join()
-            if client.result:
-                results[period].append(client.result)
-        
-        return results
-
-    def simulate_cancellations(self, booking_ids: list, cancel_rate: float = 0.1) -> int:
-        """Simulate random cancellations"""
-        import random
-        
-        num_cancellations = int(len(booking_ids) * cancel_rate)
-        cancelled = 0
-        
-        for _ in range(num_cancellations):
-            if not booking_ids:
-                break
-            booking_id = random.choice(booking_ids)
-            # Extract client_id from booking
-            booking = self.booking_system.get_booking(booking_id)
-            if booking:
-                if self.booking_system.cancel_booking(booking_id, booking["client_id"]):
-                    cancelled += 1
-                    booking_ids.remove(booking_id)
-        
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional
+
+# Shared worker pool for all Client bookings: bursts of clients reuse
+# warm pool threads instead of paying thread create/destroy per booking
+_CLIENT_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="client")
+
+
+class Client:
+    """Simulated client executed on the shared worker pool
+
+    Keeps the thread-like start()/join() surface callers already use,
+    but start() submits to the pool rather than spawning a thread.
+    """
+
+    # Bursty phases allocate Clients by the hundred; slots drop the
+    # per-instance __dict__ so each one is a single small allocation
+    __slots__ = ('client_id', 'booking_system', 'travel_date', 'booking_delay',
+                 'preferred_bus', 'preferred_seat', 'result', '_future',
+                 '_start_deadline', 'start_barrier')
+
+    def __init__(self, client_id: str, booking_system, travel_date: str,
+                 booking_delay: float = 0.1, preferred_bus: Optional[int] = None,
+                 preferred_seat: Optional[int] = None,
+                 start_barrier: Optional[threading.Barrier] = None):
+        self.client_id = client_id
+        self.booking_system = booking_system
+        self.travel_date = travel_date
+        self.booking_delay = booking_delay
+        self.preferred_bus = preferred_bus
+        self.preferred_seat = preferred_seat
+        self.result = None
+        self._future = None
+        # Optional rendezvous: a shared Barrier lines all clients up so
+        # a burst hits the system at once without staggered sleeps.
+        # Parties must not exceed the pool's worker count or the group
+        # can never assemble
+        self.start_barrier = start_barrier
+        # Absolute deadline fixed at construction: pool queueing latency
+        # counts against the delay instead of being added on top of it
+        self._start_deadline = time.monotonic() + booking_delay
+
+    def start(self):
+        """Submit the booking request to the shared pool"""
+        self._future = _CLIENT_POOL.submit(self.run)
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the booking request to finish"""
+        if self._future is not None:
+            self._future.result(timeout=timeout)
+
+    def run(self):
+        """Execute booking request"""
+        if self.start_barrier is not None:
+            self.start_barrier.wait()
+        else:
+            remaining = self._start_deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        self.result = self.booking_system.book_seat_for_client(
+            self.client_id, 
+            self.travel_date,
+            self.preferred_bus,
+            self.preferred_seat
+        )
+
+
+class BulkBookingClient:
+    """Client for making multiple bookings"""
+
+    __slots__ = ('client_id', 'booking_system', 'bookings')
+
+    def __init__(self, client_id: str, booking_system):
+        self.client_id = client_id
+        self.booking_system = booking_system
+        # Keyed by booking_id so cancels are a dict pop, not a list scan
+        self.bookings = {}
+
+    def make_booking(self, travel_date: str, preferred_bus: Optional[int] = None,
+                    preferred_seat: Optional[int] = None) -> dict:
+        """Make a single booking"""
+        result = self.booking_system.book_seat_for_client(
+            self.client_id,
+            travel_date,
+            preferred_bus,
+            preferred_seat
+        )
+        if result["status"] == "success":
+            self.bookings[result["booking_id"]] = result
+        return result
+
+    def cancel_booking(self, booking_id: str) -> bool:
+        """Cancel a booking"""
+        success = self.booking_system.cancel_booking(booking_id, self.client_id)
+        if success:
+            self.bookings.pop(booking_id, None)
+        return success
+
+    def get_my_bookings(self) -> list:
+        """Get all bookings for this client"""
+        return self.booking_system.get_client_bookings(self.client_id)
+
+    def cancel_all_bookings(self) -> int:
+        """Cancel all bookings for this client"""
+        cancelled = 0
+        for booking_id in list(self.bookings):
+            if self.cancel_booking(booking_id):
+                cancelled += 1
+        return cancelled
+
+
+def iter_results(clients: list) -> Iterator[dict]:
+    """Yield client results in completion order
+
+    Streams each result as its pool future finishes, so callers can
+    aggregate while slower bookings are still running instead of
+    joining every client in submission order first.
+    """
+    future_map = {c._future: c for c in clients if c._future is not None}
+    for future in as_completed(future_map):
+        future.result()
+        result = future_map[future].result
+        if result is not None:
+            yield result
+
+
+def client_booking_process(client_id: str, booking_system, travel_date: str, 
+                          result_queue: queue.Queue, preferred_bus: Optional[int] = None,
+                          preferred_seat: Optional[int] = None):
+    """For multiprocessing approach"""
+    result = booking_system.book_seat_for_client(
+        client_id, 
+        travel_date,
+        preferred_bus,
+        preferred_seat
+    )
+    result_queue.put(result)
+
+
+class LoadGenerator:
+    """Generates realistic booking load for testing"""
+    
+    def __init__(self, booking_system):
+        self.booking_system = booking_system
+        self.active_clients = []
+
+    def generate_steady_load(self, num_clients: int, dates: list, 
+                           delay_between_clients: float = 0.1) -> list:
+        """Generate steady booking load"""
+        clients = []
+        
+        for i in range(num_clients):
+            date = dates[i % len(dates)]
+            client = Client(
+                f"load_client_{i}",
+                self.booking_system,
+                date,
+                booking_delay=delay_between_clients
+            )
+            client.start()
+            clients.append(client)
+        
+        return clients
+
+    def generate_burst_load(self, num_clients: int, dates: list) -> list:
+        """Generate burst of concurrent bookings"""
+        clients = []
+        
+        for i in range(num_clients):
+            date = dates[i % len(dates)]
+            client = Client(
+                f"burst_client_{i}",
+                self.booking_system,
+                date,
+                booking_delay=0.01  # Minimal delay for burst
+            )
+            client.start()
+            clients.append(client)
+        
+        return clients
+
+    def generate_mixed_load(self, num_steady: int, num_burst: int, dates: list) -> tuple:
+        """Generate mixed load pattern"""
+        steady_clients = self.generate_steady_load(num_steady, dates)
+        time.sleep(0.5)  # Wait before burst
+        burst_clients = self.generate_burst_load(num_burst, dates)
+        
+        return steady_clients, burst_clients
+
+    def wait_for_clients(self, clients: list) -> list:
+        """Wait for all clients to complete and return results"""
+        return list(iter_results(clients))
+
+
+class ClientSimulator:
+    """Advanced client simulation with realistic patterns"""
+    
+    def __init__(self, booking_system):
+        self.booking_system = booking_system
+
+    def simulate_normal_day(self, num_clients: int, dates: list) -> dict:
+        """Simulate normal booking day with varied timing"""
+        import random
+        
+        clients = []
+        results = {"morning": [], "afternoon": [], "evening": []}
+        
+        # Morning rush (40% of clients)
+        morning_clients = int(num_clients * 0.4)
+        for i in range(morning_clients):
+            date = random.choice(dates)
+            delay = random.uniform(0, 0.2)
+            client = Client(f"morning_{i}", self.booking_system, date, delay)
+            client.start()
+            clients.append(("morning", client))
+        
+        time.sleep(1)  # Simulate time gap
+        
+        # Afternoon steady (30% of clients)
+        afternoon_clients = int(num_clients * 0.3)
+        for i in range(afternoon_clients):
+            date = random.choice(dates)
+            delay = random.uniform(0.1, 0.5)
+            client = Client(f"afternoon_{i}", self.booking_system, date, delay)
+            client.start()
+            clients.append(("afternoon", client))
+        
+        time.sleep(1)  # Simulate time gap
+        
+        # Evening rush (30% of clients)
+        evening_clients = num_clients - morning_clients - afternoon_clients
+        for i in range(evening_clients):
+            date = random.choice(dates)
+            delay = random.uniform(0, 0.15)
+            client = Client(f"evening_{i}", self.booking_system, date, delay)
+            client.start()
+            clients.append(("evening", client))
+        
+        # Collect results
+        for period, client in clients:
+            client.join()
+            if client.result:
+                results[period].append(client.result)
+        
+        return results
+
+    def simulate_cancellations(self, booking_ids, cancel_rate: float = 0.1) -> int:
+        """Simulate random cancellations
+
+        Accepts any iterable of booking ids: lists keep the original
+        draw-exactly-N behavior, while generators are consumed lazily
+        with a Bernoulli draw per id so callers never have to
+        materialize every id up front.
+        """
+        import random
+
+        cancelled = 0
+
+        if isinstance(booking_ids, list):
+            num_cancellations = int(len(booking_ids) * cancel_rate)
+            for _ in range(num_cancellations):
+                if not booking_ids:
+                    break
+                booking_id = random.choice(booking_ids)
+                # Extract client_id from booking
+                booking = self.booking_system.get_booking(booking_id)
+                if booking:
+                    if self.booking_system.cancel_booking(booking_id, booking["client_id"]):
+                        cancelled += 1
+                        booking_ids.remove(booking_id)
+            return cancelled
+
+        draw = random.random
+        for booking_id in booking_ids:
+            if draw() < cancel_rate:
+                booking = self.booking_system.get_booking(booking_id)
+                if booking:
+                    if self.booking_system.cancel_booking(booking_id, booking["client_id"]):
+                        cancelled += 1
         return cancelled
\ No newline at end of file
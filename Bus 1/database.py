@@ -1,244 +1,560 @@
-# database.py
-import sqlite3
-import threading
-from contextlib import contextmanager
-from config import DB_TYPE, DB_CONNECTION_STRING
-
-class DatabaseManager:
-    """Simple SQLite database manager"""
-    
-    def __init__(self, db_path="bus_booking.db"):
-        self.db_path = db_path
-        self._local = threading.local()
-        self._init_db()
-    
-    def _init_db(self):
-        """Initialize database tables"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Bookings table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bookings (
-                    booking_id TEXT PRIMARY KEY,
-                    client_id TEXT NOT NULL,
-                    bus_id INTEGER NOT NULL,
-                    seat INTEGER NOT NULL,
-                    date TEXT NOT NULL,
-                    booking_time TEXT NOT NULL
-                )
-            ''')
-            
-            # Buses table (for persistence)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS buses (
-                    bus_id INTEGER PRIMARY KEY,
-                    total_seats INTEGER NOT NULL,
-                    route TEXT NOT NULL,
-                    status TEXT NOT NULL DEFAULT 'active'
-                )
-            ''')
-            
-            # Bus seats table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bus_seats (
-                    bus_id INTEGER,
-                    seat_number INTEGER,
-                    client_id TEXT,
-                    departure_date TEXT,
-                    PRIMARY KEY (bus_id, seat_number, departure_date),
-                    FOREIGN KEY (bus_id) REFERENCES buses (bus_id)
-                )
-            ''')
-            
-            conn.commit()
-    
-    @contextmanager
-    def _get_connection(self):
-        """Thread-safe connection management"""
-        if not hasattr(self._local, 'conn'):
-            self._local.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self._local.conn.row_factory = sqlite3.Row
-        
-        try:
-            yield self._local.conn
-        except Exception:
-            self._local.conn.rollback()
-            raise
-        else:
-            self._local.conn.commit()
-    
-    @contextmanager
-    def atomic_transaction(self):
-        """Provide an atomic database transaction context"""
-        with self._get_connection() as conn:
-            try:
-                conn.execute("BEGIN IMMEDIATE;")  # locks DB for write safety
-                yield conn
-            except Exception:
-                conn.rollback()
-                raise
-            else:
-                conn.commit()
-
-    
-    def save_booking(self, booking_data, conn=None):
-        """Save a booking to database (optionally inside an active transaction)"""
-        internal = False
-        if conn is None:
-            internal = True
-            conn_ctx = self._get_connection()
-            conn = conn_ctx.__enter__()
-        
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO bookings 
-                (booking_id, client_id, bus_id, seat, date, booking_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                booking_data['booking_id'],
-                booking_data['client_id'],
-                booking_data['bus_id'],
-                booking_data['seat'],
-                booking_data['date'],
-                booking_data['booking_time']
-            ))
-            if internal:
-                conn_ctx.__exit__(None, None, None)
-        except Exception as e:
-            if internal:
-                conn_ctx.__exit__(type(e), e, e.__traceback__)
-            raise
-
-    
-    # def delete_booking(self, booking_id):
-    #     """Delete a booking from database"""
-    #     with self._get_connection() as conn:
-    #         cursor = conn.cursor()
-    #         cursor.execute('DELETE FROM bookings WHERE booking_id = ?', (booking_id,))
-    
-    def get_all_bookings(self):
-        """Get all bookings from database"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM bookings')
-            return [dict(row) for row in cursor.fetchall()]
-    def get_booking_by_id(self, booking_id):
-        """Get a single booking by its booking_id"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM bookings WHERE booking_id = ?', (booking_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
-
-    
-    def get_client_bookings(self, client_id):
-        """Get all bookings for a client"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM bookings WHERE client_id = ?', (client_id,))
-            return [dict(row) for row in cursor.fetchall()]
-    
-    def get_bus_by_id(self, bus_id):
-        """Get a specific bus by ID"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM buses WHERE bus_id = ?', (bus_id,))
-            result = cursor.fetchone()
-            return dict(result) if result else None
-
-    def update_bus_status(self, bus_id, status):
-        """Update bus status (active/inactive/merged)"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE buses 
-                SET status = ? 
-                WHERE bus_id = ?
-            ''', (status, bus_id))
-
-    def add_bus(self, bus_id, total_seats, route, status='active'):
-        """Add a new bus to the database"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO buses (bus_id, total_seats, route, status)
-                VALUES (?, ?, ?, ?)
-            ''', (bus_id, total_seats, route, status))
-
-    # def delete_bus(self, bus_id):
-    #     """Delete a bus from the database"""
-    #     with self._get_connection() as conn:
-    #         cursor = conn.cursor()
-    #         cursor.execute('DELETE FROM buses WHERE bus_id = ?', (bus_id,))
-    
-    def get_all_buses(self):
-        """Get all buses from database"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM buses 
-                ORDER BY bus_id
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
-    
-    def save_bus_seat(self, bus_id, seat_number, client_id, departure_date):
-        """Save bus seat assignment"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO bus_seats 
-                (bus_id, seat_number, client_id, departure_date)
-                VALUES (?, ?, ?, ?)
-            ''', (bus_id, seat_number, client_id, departure_date))
-    
-    def delete_bus_seat(self, bus_id, seat_number, departure_date):
-        """Remove bus seat assignment"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM bus_seats 
-                WHERE bus_id = ? AND seat_number = ? AND departure_date = ?
-            ''', (bus_id, seat_number, departure_date))
-    
-    def get_bus_seats(self, bus_id, departure_date):
-        """Get all seat assignments for a bus on a date"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM bus_seats 
-                WHERE bus_id = ? AND departure_date = ?
-            ''', (bus_id, departure_date))
-            return {row['seat_number']: row['client_id'] for row in cursor.fetchall()}
-
-    def get_all_dates_for_bus(self, bus_id: int) -> list:
-        """Get all unique departure dates for a specific bus"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT DISTINCT departure_date 
-                FROM bus_seats 
-                WHERE bus_id = ?
-                ORDER BY departure_date
-            ''', (bus_id,))
-            rows = cursor.fetchall()
-            return [row['departure_date'] for row in rows if row['departure_date']]
-    
-    def get_all_dates(self) -> list:
-        """Get all unique departure dates across all buses"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT DISTINCT departure_date 
-                FROM bus_seats 
-                ORDER BY departure_date
-            ''')
-            rows = cursor.fetchall()
-            return [row['departure_date'] for row in rows if row['departure_date']]
-
-    
-    def close(self):
-        """Close database connection"""
-        if hasattr(self._local, 'conn'):
-            self._local.conn.close()
\ No newline at end of file
+# database.py
+import os
+import queue
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from config import DB_TYPE, DB_CONNECTION_STRING
+
+# Async writer tuning: drain up to WRITE_BATCH_SIZE queued statements
+# per transaction, waiting at most WRITE_BATCH_TIMEOUT for the first one
+WRITE_BATCH_SIZE = 256
+WRITE_BATCH_TIMEOUT = 0.05
+
+# Hot-path SQL as module constants: passing the same string object to
+# execute makes the per-connection statement-cache hit identity-fast
+_SQL_INSERT_BOOKING = '''
+    INSERT OR REPLACE INTO bookings
+    (booking_id, client_id, bus_id, seat, date, booking_time)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_SQL_INSERT_BUS_SEAT = '''
+    INSERT OR REPLACE INTO bus_seats
+    (bus_id, seat_number, client_id, departure_date)
+    VALUES (?, ?, ?, ?)
+'''
+_SQL_DELETE_BOOKING = 'DELETE FROM bookings WHERE booking_id = ?'
+_SQL_DELETE_BUS_SEAT = '''
+    DELETE FROM bus_seats
+    WHERE bus_id = ? AND seat_number = ? AND departure_date = ?
+'''
+_SQL_DELETE_BUS_SEAT_OF_CLIENT = '''
+    DELETE FROM bus_seats
+    WHERE bus_id = ? AND seat_number = ? AND departure_date = ?
+      AND client_id = ?
+'''
+
+# Column order of SELECT * FROM bookings, for tuple-row bulk reads
+_BOOKING_COLS = ('booking_id', 'client_id', 'bus_id', 'seat', 'date',
+                 'booking_time')
+
+class DatabaseManager:
+    """Simple SQLite database manager"""
+
+    def __init__(self, db_path="bus_booking.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        # Read-only connections are pooled and shared across threads so
+        # WAL readers never queue behind the write connection
+        self._read_pool: queue.Queue = queue.Queue()
+        self._init_db()
+        # Pre-warm the pool after the tables exist so the burst phases
+        # never pay connect latency on a hot read path; sized like a
+        # typical read pool (2x cores, capped)
+        for _ in range(min((os.cpu_count() or 1) * 2, 10)):
+            self._read_pool.put(self._new_connection(read_only=True))
+        # Fire-and-forget writes (expired-seat deletes, status updates)
+        # go through one writer thread that groups them into batched
+        # transactions, so N queued writes cost one fsync, not N.
+        # Mirrors the AsyncLogger queue/batch model.
+        self._write_queue: queue.Queue = queue.Queue()
+        self._writer_active = True
+        self._writer_thread = threading.Thread(
+            target=self._async_write_worker, daemon=True
+        )
+        self._writer_thread.start()
+
+    def enqueue_write(self, sql, params):
+        """Queue a write for the async writer thread (non-blocking)
+
+        Only for writes whose result the caller does not need; paths
+        that must observe the outcome (seat-claim INSERTs, cancels) stay
+        synchronous.
+        """
+        self._write_queue.put((sql, params))
+
+    def flush(self):
+        """Block until every write queued so far has been committed"""
+        done = threading.Event()
+        self._write_queue.put(done)
+        done.wait()
+
+    def _async_write_worker(self):
+        """Drain queued writes into grouped executemany transactions"""
+        conn = self._new_connection()
+        while self._writer_active or not self._write_queue.empty():
+            try:
+                first = self._write_queue.get(timeout=WRITE_BATCH_TIMEOUT)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Group identical statements so each runs as one executemany
+            grouped = defaultdict(list)
+            events = []
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    events.append(entry)
+                else:
+                    grouped[entry[0]].append(entry[1])
+            try:
+                if grouped:
+                    conn.execute("BEGIN IMMEDIATE;")
+                    for sql, param_rows in grouped.items():
+                        conn.executemany(sql, param_rows)
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+            finally:
+                for event in events:
+                    event.set()
+        conn.close()
+
+    def _new_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the standard pragmas applied"""
+        # cached_statements keeps prepared statements for our whole query
+        # set resident, so repeat executes skip the SQL parse/plan step
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run concurrently with the writer, NORMAL
+        # skips the fsync-per-commit that FULL pays inside WAL, and the
+        # busy timeout retries instead of failing on a locked database.
+        # WAL is file-backed, so skip it for in-memory databases.
+        if self.db_path != ':memory:':
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # ~20 MB page cache, temp structures in RAM, and checkpoint the
+        # WAL every ~1000 pages so it never grows unbounded under the
+        # burst-write phases
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+        if read_only:
+            # Pool connections never write; query_only makes SQLite
+            # enforce that and lets it skip write-path bookkeeping
+            conn.execute("PRAGMA query_only=1")
+        return conn
+    
+    def _init_db(self):
+        """Initialize database tables"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Bookings table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bookings (
+                    booking_id TEXT PRIMARY KEY,
+                    client_id TEXT NOT NULL,
+                    bus_id INTEGER NOT NULL,
+                    seat INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    booking_time TEXT NOT NULL
+                )
+            ''')
+            
+            # Buses table (for persistence)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS buses (
+                    bus_id INTEGER PRIMARY KEY,
+                    total_seats INTEGER NOT NULL,
+                    route TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'active'
+                )
+            ''')
+            
+            # Bus seats table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bus_seats (
+                    bus_id INTEGER,
+                    seat_number INTEGER,
+                    client_id TEXT,
+                    departure_date TEXT,
+                    PRIMARY KEY (bus_id, seat_number, departure_date),
+                    FOREIGN KEY (bus_id) REFERENCES buses (bus_id)
+                )
+            ''')
+
+            # Indexes for the hot WHERE clauses: client lookups on
+            # bookings and (bus, date) seat scans would otherwise walk
+            # the whole table
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_bookings_client
+                ON bookings(client_id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_bookings_bus_date
+                ON bookings(bus_id, date)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_bus_seats_bus_date
+                ON bus_seats(bus_id, departure_date)
+            ''')
+            # Give the planner fresh statistics so it actually picks them
+            cursor.execute('ANALYZE')
+
+            conn.commit()
+    
+    def _get_raw_conn(self) -> sqlite3.Connection:
+        """Thread-local write connection without the commit wrapper"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = self._new_connection()
+        return self._local.conn
+
+    @contextmanager
+    def _get_connection(self):
+        """Thread-safe write connection management"""
+        conn = self._get_raw_conn()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+    @contextmanager
+    def _get_read_connection(self):
+        """Check a read-only connection out of the shared pool"""
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection(read_only=True)
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+    
+    @contextmanager
+    def bulk_load(self):
+        """Single transaction tuned for batch restores
+
+        Drops synchronous to OFF for the duration so the fsync cost is
+        paid once at commit instead of per row, then restores NORMAL.
+        Intended for startup seeding and restore-from-backup paths, not
+        for live booking traffic.
+        """
+        with self._get_connection() as conn:
+            # The safety level can only change outside a transaction, so
+            # set it before BEGIN and restore it after the commit
+            conn.execute("PRAGMA synchronous=OFF")
+            try:
+                conn.execute("BEGIN IMMEDIATE;")
+                conn.execute("PRAGMA defer_foreign_keys=ON")
+                try:
+                    yield conn
+                except Exception:
+                    conn.rollback()
+                    raise
+                else:
+                    conn.commit()
+            finally:
+                conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextmanager
+    def atomic_transaction(self):
+        """Provide an atomic database transaction context"""
+        with self._get_connection() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE;")  # locks DB for write safety
+                # If FK enforcement is on, check once at commit instead
+                # of per row (bus_seats carries an FK to buses)
+                conn.execute("PRAGMA defer_foreign_keys=ON")
+                yield conn
+            except Exception:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    
+    def save_booking(self, booking_data, conn=None):
+        """Save a booking to database (optionally inside an active transaction)"""
+        params = (
+            booking_data['booking_id'],
+            booking_data['client_id'],
+            booking_data['bus_id'],
+            booking_data['seat'],
+            booking_data['date'],
+            booking_data['booking_time']
+        )
+        if conn is not None:
+            # Caller owns the transaction; just add our statement to it
+            conn.execute(_SQL_INSERT_BOOKING, params)
+            return
+
+        # Standalone fast path: raw thread-local connection, direct
+        # commit/rollback — no generator frame or __enter__/__exit__
+        conn = self._get_raw_conn()
+        try:
+            conn.execute(_SQL_INSERT_BOOKING, params)
+        except Exception:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+    
+    def save_bookings_bulk(self, bookings):
+        """Save many bookings in one executemany / one transaction"""
+        if not bookings:
+            return
+        with self._get_connection() as conn:
+            conn.executemany(_SQL_INSERT_BOOKING, [
+                (b['booking_id'], b['client_id'], b['bus_id'],
+                 b['seat'], b['date'], b['booking_time'])
+                for b in bookings
+            ])
+
+    def save_bus_seats_bulk(self, seat_rows):
+        """Save many (bus_id, seat_number, client_id, departure_date) rows
+        in one executemany / one transaction"""
+        if not seat_rows:
+            return
+        with self._get_connection() as conn:
+            conn.executemany(_SQL_INSERT_BUS_SEAT, seat_rows)
+
+    # def delete_booking(self, booking_id):
+    #     """Delete a booking from database"""
+    #     with self._get_connection() as conn:
+    #         cursor = conn.cursor()
+    #         cursor.execute('DELETE FROM bookings WHERE booking_id = ?', (booking_id,))
+
+    def delete_booking_and_seat(self, booking_id, bus_id, seat_number, departure_date):
+        """Delete a booking and its seat row in one transaction
+
+        Both DELETEs run back-to-back on one cursor; with the connection's
+        statement cache they are prepared once and never reparsed, and the
+        single BEGIN IMMEDIATE keeps the write-lock hold time to one
+        commit. (SQLite cannot target two tables in one DELETE, so two
+        cached statements is as coalesced as this gets.)
+        """
+        with self.atomic_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_DELETE_BOOKING, (booking_id,))
+            cursor.execute(_SQL_DELETE_BUS_SEAT,
+                           (bus_id, seat_number, departure_date))
+    
+    def iter_all_bookings(self, batch=1000):
+        """Stream all bookings in fetchmany batches
+
+        Yields row dicts one at a time while holding memory for at most
+        one batch, so callers that iterate once never materialize the
+        whole table.
+        """
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection(read_only=True)
+        try:
+            cursor = conn.cursor()
+            # Plain tuple rows: building each dict via zip skips the
+            # intermediate sqlite3.Row objects on the bulk path
+            cursor.row_factory = None
+            cursor.execute('SELECT * FROM bookings ORDER BY booking_id')
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(_BOOKING_COLS, row))
+        finally:
+            self._read_pool.put(conn)
+
+    def get_all_bookings(self):
+        """Get all bookings from database"""
+        return list(self.iter_all_bookings())
+    def get_booking_by_id(self, booking_id):
+        """Get a single booking by its booking_id"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM bookings WHERE booking_id = ?', (booking_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    
+    def get_client_bookings(self, client_id):
+        """Get all bookings for a client"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM bookings WHERE client_id = ?', (client_id,))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_bus_by_id(self, bus_id):
+        """Get a specific bus by ID"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM buses WHERE bus_id = ?', (bus_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
+
+    def update_bus_status(self, bus_id, status):
+        """Update bus status (active/inactive/merged)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE buses 
+                SET status = ? 
+                WHERE bus_id = ?
+            ''', (status, bus_id))
+
+    def add_bus(self, bus_id, total_seats, route, status='active'):
+        """Add a new bus to the database"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO buses (bus_id, total_seats, route, status)
+                VALUES (?, ?, ?, ?)
+            ''', (bus_id, total_seats, route, status))
+
+    def add_buses_bulk(self, bus_rows):
+        """Seed many (bus_id, total_seats, route, status) rows at once
+
+        One bulk_load transaction replaces a per-bus round-trip of
+        get_bus_by_id + add_bus; OR IGNORE makes reseeding idempotent.
+        """
+        if not bus_rows:
+            return
+        with self.bulk_load() as conn:
+            conn.executemany('''
+                INSERT OR IGNORE INTO buses (bus_id, total_seats, route, status)
+                VALUES (?, ?, ?, ?)
+            ''', bus_rows)
+
+    # def delete_bus(self, bus_id):
+    #     """Delete a bus from the database"""
+    #     with self._get_connection() as conn:
+    #         cursor = conn.cursor()
+    #         cursor.execute('DELETE FROM buses WHERE bus_id = ?', (bus_id,))
+    
+    def get_all_buses(self):
+        """Get all buses from database"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM buses 
+                ORDER BY bus_id
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def save_bus_seat(self, bus_id, seat_number, client_id, departure_date):
+        """Save bus seat assignment"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_INSERT_BUS_SEAT,
+                           (bus_id, seat_number, client_id, departure_date))
+    
+    def delete_bus_seat(self, bus_id, seat_number, departure_date, client_id=None):
+        """Remove bus seat assignment (async, batched by the writer thread)
+
+        Pass client_id when the seat may be re-booked before the queued
+        delete runs, so a stale delete can't remove the new holder's row.
+        """
+        if client_id is not None:
+            self.enqueue_write(_SQL_DELETE_BUS_SEAT_OF_CLIENT,
+                               (bus_id, seat_number, departure_date, client_id))
+        else:
+            self.enqueue_write(_SQL_DELETE_BUS_SEAT,
+                               (bus_id, seat_number, departure_date))
+    
+    def get_all_bus_statuses(self, departure_date):
+        """Get per-bus booked-seat counts for a date in one aggregate query"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT b.bus_id, b.total_seats, b.route, b.status,
+                       COALESCE(s.booked, 0) AS booked
+                FROM buses b
+                LEFT JOIN (
+                    SELECT bus_id, COUNT(client_id) AS booked
+                    FROM bus_seats
+                    WHERE departure_date = ?
+                    GROUP BY bus_id
+                ) s ON s.bus_id = b.bus_id
+                ORDER BY b.bus_id
+            ''', (departure_date,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_bus_seats(self, bus_id, departure_date):
+        """Get all seat assignments for a bus on a date"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            # Select only the two columns callers use; with the
+            # (bus_id, departure_date) index the PK keys carry
+            # seat_number, so the query stays close to index-only.
+            # Two-column tuple rows map straight into the result dict.
+            cursor.row_factory = None
+            cursor.execute('''
+                SELECT seat_number, client_id FROM bus_seats
+                WHERE bus_id = ? AND departure_date = ?
+            ''', (bus_id, departure_date))
+            return dict(cursor.fetchall())
+
+    def get_all_bus_seats(self, departure_date):
+        """Get seat assignments for every bus on a date in one query
+
+        Returns {bus_id: {seat_number: client_id}}; callers that loop
+        over buses fetch this once instead of one round trip per bus.
+        """
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute('''
+                SELECT bus_id, seat_number, client_id FROM bus_seats
+                WHERE departure_date = ?
+            ''', (departure_date,))
+            seat_maps = {}
+            for bus_id, seat_number, client_id in cursor.fetchall():
+                seat_maps.setdefault(bus_id, {})[seat_number] = client_id
+            return seat_maps
+
+    def get_all_dates_for_bus(self, bus_id: int) -> list:
+        """Get all unique departure dates for a specific bus"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT departure_date 
+                FROM bus_seats 
+                WHERE bus_id = ?
+                ORDER BY departure_date
+            ''', (bus_id,))
+            rows = cursor.fetchall()
+            return [row['departure_date'] for row in rows if row['departure_date']]
+    
+    def get_all_dates(self) -> list:
+        """Get all unique departure dates across all buses"""
+        with self._get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT DISTINCT departure_date 
+                FROM bus_seats 
+                ORDER BY departure_date
+            ''')
+            rows = cursor.fetchall()
+            return [row['departure_date'] for row in rows if row['departure_date']]
+
+    
+    def close(self):
+        """Close database connections"""
+        # Drain queued writes before shutting the writer down
+        if self._writer_thread.is_alive():
+            self.flush()
+        self._writer_active = False
+        self._writer_thread.join(timeout=10)
+        if hasattr(self._local, 'conn'):
+            # Refresh query-planner statistics before shutdown, as SQLite
+            # recommends for long-lived databases
+            self._local.conn.execute("PRAGMA optimize")
+            self._local.conn.close()
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
\ No newline at end of file
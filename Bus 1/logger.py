@@ -1,126 +1,190 @@
-import logging
-import threading
-import queue
-import time
-from typing import List
-from datetime import datetime
-from config import LOG_FILE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL 
-
-
-class AsyncLogger:
-    """Asynchronous logger with batched writes for improved performance"""
-    
-    def __init__(self, log_file: str = LOG_FILE,
-                 batch_size: int = LOG_BATCH_SIZE, 
-                 flush_interval: float = LOG_FLUSH_INTERVAL):
-        self.log_file = log_file
-        self.batch_size = batch_size
-        self.flush_interval = flush_interval
-        self.log_queue = queue.Queue()
-        self.logging_active = True
-        self.logger_thread = None
-        
-        # Statistics
-        self.disk_write_count = 0
-        self.disk_write_time = 0.0
-        self.lock = threading.Lock()
-        
-        # In-memory log
-        self.booking_log: List[str] = []
-        
-        self._setup_logging()
-        self._start_async_logging()
-
-    def _setup_logging(self):
-        """Configure the logging system"""
-        logging.basicConfig(
-            filename=self.log_file,
-            level=logging.INFO,
-            format='%(asctime)s - %(threadName)s - %(message)s',
-            filemode='a'
-        )
-
-    def _start_async_logging(self):
-        """Start the async logging thread"""
-        self.logger_thread = threading.Thread(
-            target=self._async_log_writer, 
-            daemon=True
-        )
-        self.logger_thread.start()
-
-    def _async_log_writer(self):
-        """Batch writes to reduce disk I/O operations"""
-        batch = []
-        last_write = time.time()
-
-        while self.logging_active or not self.log_queue.empty():
-            try:
-                log_entry = self.log_queue.get(timeout=1)
-                batch.append(log_entry)
-
-                # Write batch if size reached or interval elapsed
-                should_flush = (
-                    len(batch) >= self.batch_size or 
-                    (time.time() - last_write) > self.flush_interval
-                )
-                
-                if should_flush:
-                    self._write_batch(batch)
-                    batch = []
-                    last_write = time.time()
-
-            except queue.Empty:
-                # Write remaining batch if any
-                if batch:
-                    self._write_batch(batch)
-                    batch = []
-                    last_write = time.time()
-
-    def _write_batch(self, batch: List[str]):
-        """Write a batch of log entries to disk"""
-        if not batch:
-            return
-            
-        start_time = time.time()
-        for entry in batch:
-            logging.info(entry)
-        write_time = time.time() - start_time
-
-        with self.lock:
-            self.disk_write_count += 1
-            self.disk_write_time += write_time
-
-    def log(self, message: str):
-        """Add a log entry (async, non-blocking)"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        
-        with self.lock:
-            self.booking_log.append(log_entry)
-        
-        self.log_queue.put(message)
-
-    def get_stats(self) -> dict:
-        """Get logging statistics"""
-        with self.lock:
-            avg_write_time = (
-                self.disk_write_time / self.disk_write_count 
-                if self.disk_write_count > 0 else 0
-            )
-            return {
-                "total_writes": self.disk_write_count,
-                "total_write_time": self.disk_write_time,
-                "avg_write_time": avg_write_time,
-                "write_method": f"Async Batched ({self.batch_size} entries or {self.flush_interval}s interval)"
-            }
-
-    def get_log_history(self) -> List[str]:
-        """Get in-memory log history"""
-        with self.lock:
-            return self.booking_log.copy()
-
-    def shutdown(self):
-        """Stop logging and flush remaining entries"""
-        self.logging_active = False
-        if self.logger_thread:
-            self.logger_thread.join(timeout=10)
\ No newline at end of file
+import os
+import threading
+import time
+from collections import deque
+from typing import List
+from config import LOG_FILE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL
+
+# Bound on queued-but-unwritten entries; beyond this the oldest entries
+# are discarded (and counted) rather than letting producers fall behind
+LOG_QUEUE_MAX = 10000
+
+# Bound on the in-memory history kept for get_log_history
+LOG_HISTORY_MAX = 10000
+
+
+class AsyncLogger:
+    """Asynchronous logger with batched writes for improved performance"""
+    
+    def __init__(self, log_file: str = LOG_FILE,
+                 batch_size: int = LOG_BATCH_SIZE, 
+                 flush_interval: float = LOG_FLUSH_INTERVAL):
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # deque.append is atomic under the GIL, so producers only touch
+        # the condition variable to wake the writer — one lock per log()
+        # instead of the two a queue.Queue + booking_log lock cost
+        self.log_queue: deque = deque()
+        self._cond = threading.Condition()
+        self.logging_active = True
+        self.logger_thread = None
+
+        # Statistics
+        self.disk_write_count = 0
+        self.disk_write_time = 0.0
+        self.dropped_count = 0
+        self.lock = threading.Lock()
+
+        # Per-second memoized timestamp: log lines only carry second
+        # resolution, so strftime runs at most once per wall-clock second
+        self._last_sec = -1
+        self._last_str = ""
+        
+        # In-memory log history, bounded so long runs can't grow it
+        # without limit; only the writer thread mutates it, and deque
+        # operations are atomic under the GIL, so no lock guards it
+        self.booking_log: deque = deque(maxlen=LOG_HISTORY_MAX)
+        
+        self._setup_logging()
+        self._start_async_logging()
+
+    def _setup_logging(self):
+        """Open the log file for appending with a large write buffer
+
+        A plain buffered file replaces the logging framework: each batch
+        becomes one pre-joined write() instead of a per-entry trip
+        through handler locks, formatters and flush() calls.
+        """
+        self._fh = open(self.log_file, 'a', buffering=1 << 20)
+
+    def _start_async_logging(self):
+        """Start the async logging thread"""
+        self.logger_thread = threading.Thread(
+            target=self._async_log_writer, 
+            daemon=True
+        )
+        self.logger_thread.start()
+
+    def _async_log_writer(self):
+        """Batch writes to reduce disk I/O operations
+
+        Sleeps against a monotonic deadline: a write happens when a full
+        batch is queued or flush_interval has elapsed since the last
+        write, whichever comes first, so the flush cadence stays accurate
+        instead of resetting on every wakeup.
+        """
+        deadline = time.monotonic() + self.flush_interval
+        while self.logging_active or self.log_queue:
+            with self._cond:
+                while (self.logging_active
+                       and len(self.log_queue) < self.batch_size):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(timeout=remaining):
+                        break
+
+            # Drain everything queued so far in one shot
+            batch = []
+            while self.log_queue:
+                try:
+                    batch.append(self.log_queue.popleft())
+                except IndexError:
+                    break
+
+            if batch:
+                # Only this thread mutates booking_log, so no lock
+                self.booking_log.extend(
+                    (timestamp, message, args)
+                    for timestamp, _thread_name, message, args in batch
+                )
+                self._write_batch(batch)
+            deadline = time.monotonic() + self.flush_interval
+
+    def _write_batch(self, batch: List[tuple]):
+        """Write a batch of log entries to disk as one joined write"""
+        if not batch:
+            return
+
+        start_time = time.monotonic()
+        # %-style args are formatted here, off the caller's thread, and
+        # the whole batch goes to the OS in a single write + flush
+        lines = [
+            "%s - %s - %s" % (timestamp, thread_name,
+                              message % args if args else message)
+            for timestamp, thread_name, message, args in batch
+        ]
+        self._fh.write('\n'.join(lines) + '\n')
+        self._fh.flush()
+        write_time = time.monotonic() - start_time
+
+        with self.lock:
+            self.disk_write_count += 1
+            self.disk_write_time += write_time
+
+    def log(self, message: str, *args):
+        """Add a log entry (async, non-blocking)
+
+        Hot paths can pass a %-style format string plus args; the actual
+        string formatting is deferred to the writer thread / history reader.
+        """
+        sec = int(time.time())
+        if sec != self._last_sec:
+            # str is written before sec so a racing reader can at worst
+            # reformat the same second, never use a stale string
+            self._last_str = time.strftime("%Y-%m-%d %H:%M:%S",
+                                           time.localtime(sec))
+            self._last_sec = sec
+        timestamp = self._last_str
+
+        self.log_queue.append(
+            (timestamp, threading.current_thread().name, message, args)
+        )
+        with self._cond:
+            # Bounded-discard: drop the oldest entry rather than letting
+            # the backlog grow without limit when the writer falls behind
+            if len(self.log_queue) > LOG_QUEUE_MAX:
+                try:
+                    self.log_queue.popleft()
+                    self.dropped_count += 1
+                except IndexError:
+                    pass
+            # Only a full batch needs to wake the writer early; smaller
+            # batches go out when its flush deadline expires
+            if len(self.log_queue) >= self.batch_size:
+                self._cond.notify()
+
+    def get_stats(self) -> dict:
+        """Get logging statistics"""
+        with self.lock:
+            avg_write_time = (
+                self.disk_write_time / self.disk_write_count 
+                if self.disk_write_count > 0 else 0
+            )
+            return {
+                "total_writes": self.disk_write_count,
+                "total_write_time": self.disk_write_time,
+                "avg_write_time": avg_write_time,
+                "dropped_entries": self.dropped_count,
+                "write_method": f"Async Batched ({self.batch_size} entries or {self.flush_interval}s interval)"
+            }
+
+    def get_log_history(self) -> List[str]:
+        """Get in-memory log history (entries are formatted on read)"""
+        # list() snapshots the deque in one pass under the GIL
+        entries = list(self.booking_log)
+        return [
+            f"[{timestamp}] {message % args if args else message}"
+            for timestamp, message, args in entries
+        ]
+
+    def shutdown(self):
+        """Stop logging and flush remaining entries"""
+        self.logging_active = False
+        with self._cond:
+            self._cond.notify()
+        if self.logger_thread:
+            self.logger_thread.join(timeout=10)
+        # fsync once at shutdown rather than per batch
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
\ No newline at end of file
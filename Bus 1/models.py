@@ -1,138 +1,261 @@
-import threading
-import time
-from typing import Optional, Dict, List
-from config import DEFAULT_SEATS_PER_BUS, DEFAULT_ROUTE
-
-
-class Bus:
-    """Represents a bus with seat management capabilities"""
-    
-    def __init__(self, bus_id: int, total_seats: int = DEFAULT_SEATS_PER_BUS, route: str = DEFAULT_ROUTE):
-        self.bus_id = bus_id
-        self.total_seats = total_seats
-        self.route = route
-        # Change seats structure to be date-aware: {date: {seat: client_id}}
-        self.seats_by_date: Dict[str, Dict[int, Optional[str]]] = {}
-        self.locks: Dict[str, threading.Lock] = {}  # Lock per date
-        self.reservation_time: Dict[tuple, float] = {}  # (seat, date) -> timestamp
-        self.booking_confirmed: Dict[tuple, bool] = {}  # (seat, date) -> confirmed
-        self.status = "active"
-    
-    def _ensure_date_exists(self, date: str):
-        """Ensure date entry exists in seats_by_date"""
-        if date not in self.seats_by_date:
-            self.seats_by_date[date] = {i: None for i in range(1, self.total_seats + 1)}
-        if date not in self.locks:
-            self.locks[date] = threading.Lock()
-    
-    def get_available_seats(self, date: str) -> List[int]:
-        """Get list of available seats for a specific date"""
-        self._ensure_date_exists(date)
-        # Check if seats_by_date[date] is actually a dictionary
-        date_seats = self.seats_by_date[date]
-        
-        if isinstance(date_seats, dict):
-            return [seat for seat, client in date_seats.items() if client is None]
-        else:
-            # If it's not a dictionary, return all seats as available
-            return list(range(1, self.total_seats + 1))
-
-    
-    def get_load_factor_for_date(self, date: str) -> float:
-        """Calculate load factor for a specific date"""
-        self._ensure_date_exists(date)
-        date_seats = self.seats_by_date[date]
-
-        # Handle corrupted data
-        if not isinstance(date_seats, dict):
-            self.seats_by_date[date] = {i: None for i in range(1, self.total_seats + 1)}
-            return 0.0
-
-        booked_seats = sum(1 for client in date_seats.values() if client is not None)
-        return booked_seats / self.total_seats if self.total_seats > 0 else 0
-    
-    def get_overall_load_factor(self) -> float:
-        """Calculate overall load factor across all dates"""
-        if not self.seats_by_date:
-            return 0.0
-
-        total_capacity = len(self.seats_by_date) * self.total_seats
-        total_booked = 0
-
-        for date_seats in self.seats_by_date.values():
-            # Handle corrupted data
-            if isinstance(date_seats, dict):
-                total_booked += sum(1 for client in date_seats.values() if client is not None)
-
-        return total_booked / total_capacity if total_capacity > 0 else 0
-
-    def get_load_factor(self) -> float:
-        """Alias for get_overall_load_factor() for backward compatibility"""
-        return self.get_overall_load_factor()
-    
-    def book_seat(self, seat_number: int, client_id: str, date: str, confirmed: bool = True) -> bool:
-        """Book a specific seat for a client on a given date"""
-        self._ensure_date_exists(date)
-        
-        if 1 <= seat_number <= self.total_seats:
-            with self.locks[date]:
-                if self.seats_by_date[date][seat_number] is None:
-                    self.seats_by_date[date][seat_number] = client_id
-                    self.reservation_time[(seat_number, date)] = time.time()
-                    self.booking_confirmed[(seat_number, date)] = confirmed
-                    return True
-        return False
-    
-    def release_seat(self, seat_number: int, date: str) -> bool:
-        """Release a booked seat for a specific date"""
-        if date in self.seats_by_date and 1 <= seat_number <= self.total_seats:
-            with self.locks[date]:
-                self.seats_by_date[date][seat_number] = None
-                key = (seat_number, date)
-                if key in self.reservation_time:
-                    del self.reservation_time[key]
-                if key in self.booking_confirmed:
-                    del self.booking_confirmed[key]
-                return True
-        return False
-    
-    def is_seat_available(self, seat_number: int, date: str) -> bool:
-        """Check if a seat is available for a specific date"""
-        self._ensure_date_exists(date)
-        return self.seats_by_date[date][seat_number] is None
-
-
-class Booking:
-    """Represents a booking record"""
-    
-    def __init__(self, booking_id: str, client_id: str, bus_id: int, 
-                 seat: int, date: str, booking_time: str):
-        self.booking_id = booking_id
-        self.client_id = client_id
-        self.bus_id = bus_id
-        self.seat = seat
-        self.date = date
-        self.booking_time = booking_time
-
-    def to_dict(self) -> dict:
-        """Convert booking to dictionary"""
-        return {
-            "booking_id": self.booking_id,
-            "client_id": self.client_id,
-            "bus_id": self.bus_id,
-            "seat": self.seat,
-            "date": self.date,
-            "booking_time": self.booking_time
-        }
-
-    @classmethod
-    def from_dict(cls, data: dict) -> 'Booking':
-        """Create booking from dictionary"""
-        return cls(
-            data["booking_id"],
-            data["client_id"],
-            data["bus_id"],
-            data["seat"],
-            data["date"],
-            data["booking_time"]
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, List
+from sortedcontainers import SortedList
+from config import DEFAULT_SEATS_PER_BUS, DEFAULT_ROUTE
+
+
+class Bus:
+    """Represents a bus with seat management capabilities"""
+    
+    def __init__(self, bus_id: int, total_seats: int = DEFAULT_SEATS_PER_BUS, route: str = DEFAULT_ROUTE):
+        self.bus_id = bus_id
+        self.total_seats = total_seats
+        self.route = route
+        # Change seats structure to be date-aware: {date: {seat: client_id}}
+        self.seats_by_date: Dict[str, Dict[int, Optional[str]]] = {}
+        self.locks: Dict[str, threading.Lock] = {}  # Lock per date
+        self.reservation_time: Dict[tuple, float] = {}  # (seat, date) -> timestamp
+        # Same reservations ordered by timestamp so expiry checks only touch
+        # the oldest entries instead of scanning every reservation
+        self.reservation_expiry: SortedList = SortedList()  # (timestamp, seat, date)
+        # Single lock for reservation_expiry: date locks are per-date and
+        # the expiry sweep runs outside them, but SortedList mutations are
+        # multi-step and not atomic under the GIL
+        self._expiry_lock = threading.Lock()
+        self.booking_confirmed: Dict[tuple, bool] = {}  # (seat, date) -> confirmed
+        # Booked-seat counters kept in step with seats_by_date under the
+        # date locks, so load factors are O(1) instead of re-counting
+        self._booked_by_date: Dict[str, int] = {}
+        self._total_booked = 0
+        # Owning system, if any; notified on status changes so it can
+        # keep its active-bus view current
+        self._owner = None
+        self.status = "active"
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        # Keep a plain boolean alongside the status string so hot loops can
+        # test is_active instead of re-comparing strings
+        self._status = value
+        self.is_active = (value == "active")
+        if self._owner is not None:
+            self._owner._on_bus_status_change(self)
+
+
+    def _ensure_date_exists(self, date: str):
+        """Ensure date entry exists in seats_by_date"""
+        if date not in self.seats_by_date:
+            self.seats_by_date[date] = {i: None for i in range(1, self.total_seats + 1)}
+        if date not in self.locks:
+            self.locks[date] = threading.Lock()
+    
+    def get_available_seats(self, date: str) -> List[int]:
+        """Get list of available seats for a specific date"""
+        self._ensure_date_exists(date)
+        # Check if seats_by_date[date] is actually a dictionary
+        date_seats = self.seats_by_date[date]
+        
+        if isinstance(date_seats, dict):
+            return [seat for seat, client in date_seats.items() if client is None]
+        else:
+            # If it's not a dictionary, return all seats as available
+            return list(range(1, self.total_seats + 1))
+
+    
+    def get_load_factor_for_date(self, date: str) -> float:
+        """Calculate load factor for a specific date"""
+        self._ensure_date_exists(date)
+        date_seats = self.seats_by_date[date]
+
+        # Handle corrupted data
+        if not isinstance(date_seats, dict):
+            self.seats_by_date[date] = {i: None for i in range(1, self.total_seats + 1)}
+            self._total_booked -= self._booked_by_date.pop(date, 0)
+            return 0.0
+
+        booked_seats = self._booked_by_date.get(date, 0)
+        return booked_seats / self.total_seats if self.total_seats > 0 else 0
+    
+    def get_overall_load_factor(self) -> float:
+        """Calculate overall load factor across all dates"""
+        if not self.seats_by_date:
+            return 0.0
+
+        total_capacity = len(self.seats_by_date) * self.total_seats
+        return self._total_booked / total_capacity if total_capacity > 0 else 0
+
+    def get_load_factor(self) -> float:
+        """Alias for get_overall_load_factor() for backward compatibility"""
+        return self.get_overall_load_factor()
+    
+    def book_seat(self, seat_number: int, client_id: str, date: str, confirmed: bool = True) -> bool:
+        """Book a specific seat for a client on a given date"""
+        self._ensure_date_exists(date)
+        
+        if 1 <= seat_number <= self.total_seats:
+            with self.locks[date]:
+                if self.seats_by_date[date][seat_number] is None:
+                    timestamp = time.time()
+                    self.seats_by_date[date][seat_number] = client_id
+                    self.reservation_time[(seat_number, date)] = timestamp
+                    with self._expiry_lock:
+                        self.reservation_expiry.add((timestamp, seat_number, date))
+                    self.booking_confirmed[(seat_number, date)] = confirmed
+                    self._booked_by_date[date] = self._booked_by_date.get(date, 0) + 1
+                    self._total_booked += 1
+                    return True
+        return False
+    
+    def book_any_seat(self, client_id: str, date: str,
+                      preferred_seat: Optional[int] = None,
+                      confirmed: bool = True) -> Optional[int]:
+        """Claim the preferred seat, or the first free seat, in one atomic
+        check-and-set under the date lock; returns the seat or None"""
+        self._ensure_date_exists(date)
+        timestamp = time.time()
+        with self.locks[date]:
+            date_seats = self.seats_by_date[date]
+
+            seat_number = None
+            if (preferred_seat is not None and 1 <= preferred_seat <= self.total_seats
+                    and date_seats[preferred_seat] is None):
+                seat_number = preferred_seat
+            else:
+                for candidate, client in date_seats.items():
+                    if client is None:
+                        seat_number = candidate
+                        break
+
+            if seat_number is None:
+                return None
+
+            date_seats[seat_number] = client_id
+            self.reservation_time[(seat_number, date)] = timestamp
+            with self._expiry_lock:
+                self.reservation_expiry.add((timestamp, seat_number, date))
+            self.booking_confirmed[(seat_number, date)] = confirmed
+            self._booked_by_date[date] = self._booked_by_date.get(date, 0) + 1
+            self._total_booked += 1
+            return seat_number
+
+    def book_seats_bulk(self, date: str, assignments: List[tuple]) -> int:
+        """Book many (seat_number, client_id) pairs for one date under a
+        single lock acquisition; returns how many seats were booked"""
+        self._ensure_date_exists(date)
+        booked = 0
+        timestamp = time.time()
+        with self.locks[date]:
+            date_seats = self.seats_by_date[date]
+            for seat_number, client_id in assignments:
+                if 1 <= seat_number <= self.total_seats and date_seats[seat_number] is None:
+                    date_seats[seat_number] = client_id
+                    self.reservation_time[(seat_number, date)] = timestamp
+                    with self._expiry_lock:
+                        self.reservation_expiry.add((timestamp, seat_number, date))
+                    self.booking_confirmed[(seat_number, date)] = True
+                    booked += 1
+            if booked:
+                self._booked_by_date[date] = self._booked_by_date.get(date, 0) + booked
+                self._total_booked += booked
+        return booked
+
+    def release_seat(self, seat_number: int, date: str) -> bool:
+        """Release a booked seat for a specific date"""
+        if date in self.seats_by_date and 1 <= seat_number <= self.total_seats:
+            with self.locks[date]:
+                # Only decrement the counters when the seat was occupied;
+                # releasing an already-free seat is a no-op for the counts
+                if self.seats_by_date[date][seat_number] is not None:
+                    self._booked_by_date[date] = self._booked_by_date.get(date, 1) - 1
+                    self._total_booked -= 1
+                self.seats_by_date[date][seat_number] = None
+                key = (seat_number, date)
+                if key in self.reservation_time:
+                    with self._expiry_lock:
+                        self.reservation_expiry.discard(
+                            (self.reservation_time[key], seat_number, date)
+                        )
+                    del self.reservation_time[key]
+                if key in self.booking_confirmed:
+                    del self.booking_confirmed[key]
+                return True
+        return False
+    
+    def pop_expired_reservations(self, cutoff: float) -> List[tuple]:
+        """Pop (seat, date) pairs reserved at or before cutoff, oldest first"""
+        expired = []
+        with self._expiry_lock:
+            while self.reservation_expiry and self.reservation_expiry[0][0] <= cutoff:
+                timestamp, seat_number, date = self.reservation_expiry.pop(0)
+                # Skip stale entries that no longer match the live reservation
+                if self.reservation_time.get((seat_number, date)) == timestamp:
+                    expired.append((seat_number, date))
+        return expired
+
+    def is_seat_available(self, seat_number: int, date: str) -> bool:
+        """Check if a seat is available for a specific date"""
+        self._ensure_date_exists(date)
+        return self.seats_by_date[date][seat_number] is None
+
+
+@dataclass(slots=True)
+class Booking:
+    """Represents a booking record
+
+    A slotted dataclass instead of a per-booking dict: with no
+    per-instance __dict__, a large bookings_db stores six fixed slots
+    per record and attribute access is a C-level slot read.
+    """
+
+    booking_id: str
+    client_id: str
+    bus_id: int
+    seat: int
+    date: str
+    booking_time: str
+
+    # Dict-style access so call sites that treated bookings as plain
+    # dicts keep working unchanged
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self) -> dict:
+        """Convert booking to dictionary"""
+        return {
+            "booking_id": self.booking_id,
+            "client_id": self.client_id,
+            "bus_id": self.bus_id,
+            "seat": self.seat,
+            "date": self.date,
+            "booking_time": self.booking_time
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Booking':
+        """Create booking from dictionary"""
+        # Interned to share one string per repeated client id and date,
+        # matching what book_seat_for_client stores at the API boundary
+        return cls(
+            data["booking_id"],
+            sys.intern(data["client_id"]),
+            data["bus_id"],
+            data["seat"],
+            sys.intern(data["date"]),
+            data["booking_time"]
         )
\ No newline at end of file
@@ -1,164 +1,200 @@
-import threading
-import time
-import psutil
-import os
-from typing import List, Dict, Optional
-from config import MONITOR_INTERVAL, ENABLE_DETAILED_STATS
-
-
-class PerformanceMonitor:
-    """Monitors system performance metrics"""
-    
-    def __init__(self, booking_system):
-        self.booking_system = booking_system
-        self.monitoring = False
-        self.monitor_thread: Optional[threading.Thread] = None
-        self.stats_history: List[Dict] = []
-        self.start_time: Optional[float] = None
-        self.end_time: Optional[float] = None
-        self.enable_detailed_stats = ENABLE_DETAILED_STATS
-
-    def start_monitoring(self, interval: float = MONITOR_INTERVAL):
-        """Start performance monitoring"""
-        self.monitoring = True
-        self.start_time = time.time()
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_loop, 
-            args=(interval,),
-            daemon=True
-        )
-        self.monitor_thread.start()
-
-    def stop_monitoring(self):
-        """Stop performance monitoring"""
-        self.monitoring = False
-        self.end_time = time.time()
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=5)
-
-    def _monitor_loop(self, interval: float):
-        """Continuous monitoring loop"""
-        while self.monitoring:
-            stats = self._collect_stats()
-            stats['timestamp'] = time.time()
-            self.stats_history.append(stats)
-            time.sleep(interval)
-
-    def _collect_stats(self) -> Dict:
-        """Collect current system statistics"""
-        process = psutil.Process(os.getpid())
-        cpu_percent = process.cpu_percent(interval=0.1)
-        memory_info = process.memory_info()
-        cpu_times = process.cpu_times()
-
-        return {
-            "cpu_usage": cpu_percent,
-            "memory_rss": memory_info.rss / (1024 * 1024),  # MB
-            "memory_vms": memory_info.vms / (1024 * 1024),  # MB
-            "num_threads": process.num_threads(),
-            "cpu_user_time": cpu_times.user,
-            "cpu_system_time": cpu_times.system
-        }
-
-    def get_current_stats(self) -> Dict:
-        """Get current system statistics"""
-        return self._collect_stats()
-
-    def get_performance_report(self) -> Dict:
-        """Generate comprehensive performance report"""
-        if not self.stats_history:
-            return {"error": "No performance data collected"}
-
-        cpu_usages = [s["cpu_usage"] for s in self.stats_history]
-        memory_rss = [s["memory_rss"] for s in self.stats_history]
-        memory_vms = [s["memory_vms"] for s in self.stats_history]
-        num_threads = [s["num_threads"] for s in self.stats_history]
-
-        total_time = self.end_time - self.start_time if self.end_time else 0
-        
-        # CORRECT CALCULATION: Average CPU usage to estimate active time
-        avg_cpu_usage = sum(cpu_usages) / len(cpu_usages) if cpu_usages else 0
-        active_time = total_time * (avg_cpu_usage / 100.0)
-        idle_time = total_time - active_time
-
-        return {
-            "max_cpu_usage": max(cpu_usages) if cpu_usages else 0,
-            "avg_cpu_usage": avg_cpu_usage,
-            "min_cpu_usage": min(cpu_usages) if cpu_usages else 0,
-            "max_physical_memory_mb": max(memory_rss) if memory_rss else 0,
-            "avg_physical_memory_mb": sum(memory_rss) / len(memory_rss) if memory_rss else 0,
-            "max_virtual_memory_mb": max(memory_vms) if memory_vms else 0,
-            "avg_virtual_memory_mb": sum(memory_vms) / len(memory_vms) if memory_vms else 0,
-            "max_threads": max(num_threads) if num_threads else 0,
-            "avg_threads": sum(num_threads) / len(num_threads) if num_threads else 0,
-            "cpu_active_time_seconds": active_time,
-            "cpu_idle_time_seconds": idle_time,
-            "cpu_utilization_percent": avg_cpu_usage,
-            "total_monitoring_time": total_time,
-            "samples_collected": len(self.stats_history)
-        }
-
-    def get_stats_history(self) -> List[Dict]:
-        """Get raw statistics history"""
-        return self.stats_history.copy()
-
-    def clear_history(self):
-        """Clear statistics history"""
-        self.stats_history.clear()
-        self.start_time = None
-        self.end_time = None
-
-
-class ResourceTracker:
-    """Tracks specific resource usage patterns"""
-    
-    def __init__(self):
-        self.lock_contentions = 0
-        self.failed_bookings = 0
-        self.successful_bookings = 0
-        self.cancelled_bookings = 0
-        self.lock = threading.Lock()
-
-    def record_lock_contention(self):
-        """Record a lock contention event"""
-        with self.lock:
-            self.lock_contentions += 1
-
-    def record_booking_attempt(self, success: bool):
-        """Record a booking attempt"""
-        with self.lock:
-            if success:
-                self.successful_bookings += 1
-            else:
-                self.failed_bookings += 1
-
-    def record_cancellation(self):
-        """Record a booking cancellation"""
-        with self.lock:
-            self.cancelled_bookings += 1
-
-    def get_stats(self) -> Dict:
-        """Get resource tracking statistics"""
-        with self.lock:
-            total_attempts = self.successful_bookings + self.failed_bookings
-            success_rate = (
-                self.successful_bookings / total_attempts 
-                if total_attempts > 0 else 0
-            )
-            
-            return {
-                "lock_contentions": self.lock_contentions,
-                "successful_bookings": self.successful_bookings,
-                "failed_bookings": self.failed_bookings,
-                "cancelled_bookings": self.cancelled_bookings,
-                "total_attempts": total_attempts,
-                "success_rate": success_rate
-            }
-
-    def reset(self):
-        """Reset all counters"""
-        with self.lock:
-            self.lock_contentions = 0
-            self.failed_bookings = 0
-            self.successful_bookings = 0
+import threading
+import time
+import psutil
+import os
+from collections import deque
+from typing import List, Dict, Optional
+from config import MONITOR_INTERVAL, MONITOR_MAX_SAMPLES, ENABLE_DETAILED_STATS
+
+
+class PerformanceMonitor:
+    """Monitors system performance metrics"""
+    
+    def __init__(self, booking_system):
+        self.booking_system = booking_system
+        self.monitoring = False
+        self.monitor_thread: Optional[threading.Thread] = None
+        # Ring buffer: long runs keep the newest MONITOR_MAX_SAMPLES
+        # samples instead of growing without bound
+        self.stats_history: deque = deque(maxlen=MONITOR_MAX_SAMPLES)
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        self.enable_detailed_stats = ENABLE_DETAILED_STATS
+        # One Process handle for the monitor's lifetime; constructing a
+        # new one per sample re-opens /proc entries on every tick
+        self._proc = psutil.Process(os.getpid())
+
+    def start_monitoring(self, interval: float = MONITOR_INTERVAL):
+        """Start performance monitoring"""
+        self.monitoring = True
+        self.start_time = time.time()
+        # Prime the CPU counter so the first non-blocking cpu_percent
+        # call in the loop has a previous reading to diff against
+        self._proc.cpu_percent(interval=None)
+        self.monitor_thread = threading.Thread(
+            target=self._monitor_loop, 
+            args=(interval,),
+            daemon=True
+        )
+        self.monitor_thread.start()
+
+    def stop_monitoring(self):
+        """Stop performance monitoring"""
+        self.monitoring = False
+        self.end_time = time.time()
+        if self.monitor_thread:
+            self.monitor_thread.join(timeout=5)
+
+    def _monitor_loop(self, interval: float):
+        """Continuous monitoring loop"""
+        while self.monitoring:
+            stats = self._collect_stats()
+            stats['timestamp'] = time.time()
+            self.stats_history.append(stats)
+            time.sleep(interval)
+
+    def _collect_stats(self) -> Dict:
+        """Collect current system statistics"""
+        # One as_dict call batches the /proc reads for all four metrics;
+        # cpu_percent comes back non-blocking, diffed against the
+        # previous sample rather than sleeping inside psutil
+        info = self._proc.as_dict(
+            attrs=['cpu_percent', 'memory_info', 'cpu_times', 'num_threads']
+        )
+        memory_info = info['memory_info']
+        cpu_times = info['cpu_times']
+
+        return {
+            "cpu_usage": info['cpu_percent'],
+            "memory_rss": memory_info.rss / (1024 * 1024),  # MB
+            "memory_vms": memory_info.vms / (1024 * 1024),  # MB
+            "num_threads": info['num_threads'],
+            "cpu_user_time": cpu_times.user,
+            "cpu_system_time": cpu_times.system
+        }
+
+    def get_current_stats(self) -> Dict:
+        """Get current system statistics"""
+        return self._collect_stats()
+
+    def get_performance_report(self) -> Dict:
+        """Generate comprehensive performance report"""
+        # Snapshot: the monitor thread keeps appending while we aggregate
+        samples = list(self.stats_history)
+        if not samples:
+            return {"error": "No performance data collected"}
+
+        # Single pass over the samples instead of building one list per
+        # metric and re-walking each with max/min/sum
+        count = len(samples)
+        max_cpu = min_cpu = samples[0]["cpu_usage"]
+        sum_cpu = sum_rss = sum_vms = sum_threads = 0
+        max_rss = max_vms = max_threads = 0
+        for s in samples:
+            cpu = s["cpu_usage"]
+            rss = s["memory_rss"]
+            vms = s["memory_vms"]
+            threads = s["num_threads"]
+            if cpu > max_cpu:
+                max_cpu = cpu
+            if cpu < min_cpu:
+                min_cpu = cpu
+            sum_cpu += cpu
+            if rss > max_rss:
+                max_rss = rss
+            sum_rss += rss
+            if vms > max_vms:
+                max_vms = vms
+            sum_vms += vms
+            if threads > max_threads:
+                max_threads = threads
+            sum_threads += threads
+
+        total_time = self.end_time - self.start_time if self.end_time else 0
+
+        # CORRECT CALCULATION: Average CPU usage to estimate active time
+        avg_cpu_usage = sum_cpu / count
+        active_time = total_time * (avg_cpu_usage / 100.0)
+        idle_time = total_time - active_time
+
+        return {
+            "max_cpu_usage": max_cpu,
+            "avg_cpu_usage": avg_cpu_usage,
+            "min_cpu_usage": min_cpu,
+            "max_physical_memory_mb": max_rss,
+            "avg_physical_memory_mb": sum_rss / count,
+            "max_virtual_memory_mb": max_vms,
+            "avg_virtual_memory_mb": sum_vms / count,
+            "max_threads": max_threads,
+            "avg_threads": sum_threads / count,
+            "cpu_active_time_seconds": active_time,
+            "cpu_idle_time_seconds": idle_time,
+            "cpu_utilization_percent": avg_cpu_usage,
+            "total_monitoring_time": total_time,
+            "samples_collected": count
+        }
+
+    def get_stats_history(self) -> List[Dict]:
+        """Get raw statistics history"""
+        return list(self.stats_history)
+
+    def clear_history(self):
+        """Clear statistics history"""
+        self.stats_history.clear()
+        self.start_time = None
+        self.end_time = None
+
+
+class ResourceTracker:
+    """Tracks specific resource usage patterns"""
+    
+    def __init__(self):
+        self.lock_contentions = 0
+        self.failed_bookings = 0
+        self.successful_bookings = 0
+        self.cancelled_bookings = 0
+        self.lock = threading.Lock()
+
+    def record_lock_contention(self):
+        """Record a lock contention event"""
+        with self.lock:
+            self.lock_contentions += 1
+
+    def record_booking_attempt(self, success: bool):
+        """Record a booking attempt"""
+        with self.lock:
+            if success:
+                self.successful_bookings += 1
+            else:
+                self.failed_bookings += 1
+
+    def record_cancellation(self):
+        """Record a booking cancellation"""
+        with self.lock:
+            self.cancelled_bookings += 1
+
+    def get_stats(self) -> Dict:
+        """Get resource tracking statistics"""
+        with self.lock:
+            total_attempts = self.successful_bookings + self.failed_bookings
+            success_rate = (
+                self.successful_bookings / total_attempts 
+                if total_attempts > 0 else 0
+            )
+            
+            return {
+                "lock_contentions": self.lock_contentions,
+                "successful_bookings": self.successful_bookings,
+                "failed_bookings": self.failed_bookings,
+                "cancelled_bookings": self.cancelled_bookings,
+                "total_attempts": total_attempts,
+                "success_rate": success_rate
+            }
+
+    def reset(self):
+        """Reset all counters"""
+        with self.lock:
+            self.lock_contentions = 0
+            self.failed_bookings = 0
+            self.successful_bookings = 0
             self.cancelled_bookings = 0
\ No newline at end of file